@@ -6,12 +6,55 @@ import yaml
 import logging
 import argparse
 import csv
-import multiprocessing
 import logging
+import math
+import pickle
+from dataclasses import dataclass
+
+try:
+    # libyaml bindings parse 5-10x faster than the pure-Python loader
+    from yaml import CSafeLoader as SafeLoader
+except ImportError:
+    from yaml import SafeLoader
 
 
 ROOT.EnableImplicitMT()
 
+# TTreeCache.Size is a multiplicative factor on the auto-computed cache size
+# (see TTree::GetCacheAutoSize), not a byte count; raising it above the 1.0
+# default lets the scans over the few selection/weight branches prefetch a
+# few clusters ahead in large sequential reads
+ROOT.gEnv.SetValue("TTreeCache.Size", 4.0)
+
+def declare_weight_kernels():
+    """Declare the precompiled weight kernels on the current interpreter.
+
+    Declared once so Cling resolves cached symbols instead of
+    JIT-compiling a fresh product expression per Define. varyW fuses the
+    up/down variation pair into one RVec product, which the compiler can
+    vectorise, rather than two scalar multW calls in the Vary expression.
+    Runs at import in the driver and, for distributed runs, on every Dask
+    worker, which never imports this module.
+    """
+    import ROOT
+
+    ROOT.gInterpreter.Declare(
+        """
+        #ifndef RENORM_WEIGHT_KERNELS
+        #define RENORM_WEIGHT_KERNELS
+        #include "ROOT/RVec.hxx"
+        double multW(double a, double b) { return a * b; }
+        ROOT::RVecD varyW(double w, double up, double down)
+        {
+            return w * ROOT::RVecD{up, down};
+        }
+        #endif
+        """
+    )
+
+
+declare_weight_kernels()
+
 
 def ensure_root_extension(file_name):
     """Helper function to add .root extension if missing"""
@@ -42,22 +85,262 @@ logger.setLevel(logging.INFO)
 logger.addHandler(handler)
 
 
+@dataclass(frozen=True, slots=True)
+class WeightSystematic:
+    """One weight-based systematic: a name and its up/down weight strings."""
+
+    name: str
+    up_weight: str
+    down_weight: str
+
+
+@dataclass(frozen=True, slots=True)
+class YieldTask:
+    """One booking unit: a flavour's file chain spanning every folder.
+
+    The nested YAML config is flattened into these at load time so the
+    booking loop iterates a flat tuple of slotted objects instead of
+    chasing nested dict lookups per iteration. resolved_paths is the
+    subset of paths whose samples take the resolved extra selection via
+    the per-sample isResolved tag.
+    """
+
+    flavour: str
+    paths: tuple
+    resolved_paths: tuple
+    selection: str
+    weight_systematics: tuple
+
+
 class YieldResult:
     def __init__(self):
         self.yields = {}
+        self.nominal_ptr = None
+        self.variations = None
+        self.systematic_names = []
+
+    def materialise(self):
+        """Replace the lazy nominal RResultPtr/RResultMap with float yields.
 
-    def merge(self, other):
-        for sys_name, yield_value in other.yields.items():
-            self.yields[sys_name] = self.yields.get(sys_name, 0) + yield_value
+        Must only be called once the booked graphs have run; dereferencing
+        the pointers any earlier would trigger a premature event loop.
+        """
+        self.yields = {"nominal": self.nominal_ptr.GetValue()}
+        for sys_name in self.systematic_names:
+            self.yields[f"{sys_name}_up"] = self.variations[f"{sys_name}:up"]
+            self.yields[f"{sys_name}_down"] = self.variations[f"{sys_name}:down"]
 
 
 class SystematicYieldCalc:
-    def __init__(self, config_file):
+    def __init__(self, config_file, dask_scheduler=None):
         self.config = self.read_config(config_file)
         if self.config is None:
             raise ValueError("Failed to load configuration.")
         if not self.validate_config(self.config):
             raise ValueError("Configuration validation failed.")
+        self._prepare_paths()
+        self._prepare_selections()
+        self._prepare_tasks()
+        self._sum_cache = {}
+        self.dask_client = None
+        if dask_scheduler is not None:
+            from dask.distributed import Client
+
+            self.dask_client = Client(address=dask_scheduler)
+            # the workers never import this module, so the weight kernels
+            # have to be shipped to their interpreters explicitly
+            ROOT.RDF.Experimental.Distributed.initialize(declare_weight_kernels)
+            logger.info(
+                f"Distributing event loops via the Dask scheduler at {dask_scheduler}"
+            )
+
+    def _make_df(self, paths):
+        """Build a (possibly Dask-distributed) RDataFrame over the given files."""
+        if self.dask_client is not None:
+            return ROOT.RDF.Experimental.Distributed.Dask.RDataFrame(
+                "nominal_Loose", paths, daskclient=self.dask_client
+            )
+        return ROOT.RDataFrame("nominal_Loose", paths)
+
+    def _run_graphs(self, ptrs):
+        if self.dask_client is not None:
+            ROOT.RDF.Experimental.Distributed.RunGraphs(ptrs)
+        else:
+            ROOT.RDF.RunGraphs(ptrs)
+
+    def _variations_for(self, ptr):
+        if self.dask_client is not None:
+            return ROOT.RDF.Experimental.Distributed.VariationsFor(ptr)
+        return ROOT.RDF.Experimental.VariationsFor(ptr)
+
+    def _tag_resolved(self, df, resolved_paths):
+        """Set the per-sample isResolved flag used by the combined filter.
+
+        DefinePerSample fills the flag per file, so one chain spanning
+        boosted and resolved folders can share a single Filter expression
+        (and a single JIT compilation) instead of one graph per folder.
+        """
+        if not self.config.get("extra_selections", {}).get("resolved", ""):
+            return df
+        is_resolved = (
+            " || ".join(
+                f'rdfsampleinfo_.Contains("{path}")' for path in resolved_paths
+            )
+            or "false"
+        )
+        return df.DefinePerSample("isResolved", f"(double)({is_resolved})")
+
+    def _book_sum(self, paths, resolved_paths, selection, weight_expr):
+        """Return a lazy Sum over (files, selection, weight), memoised.
+
+        Systematics that share the same files, selection and weight
+        expression (common with copy-pasted configs) reuse one booked
+        RResultPtr, so ROOT only computes that yield once.
+        """
+        cache_key = (tuple(paths), selection, weight_expr)
+        if cache_key not in self._sum_cache:
+            df = self._tag_resolved(self._make_df(list(paths)), resolved_paths)
+            self._sum_cache[cache_key] = self.calculate_yields(
+                df.Filter(selection), weight_expr, []
+            ).nominal_ptr
+        return self._sum_cache[cache_key]
+
+    def _book_variation_sums(
+        self, up_paths, down_paths, resolved_paths, selection, up_weight, down_weight
+    ):
+        """Book the up and down Sums of a sample variation on one chain.
+
+        The up and down files share one dataframe: DefinePerSample tags
+        each sample as up or down, so the selection is JIT-compiled and
+        evaluated once and a single event loop fills both Sums.
+        """
+        cache_key = (
+            tuple(up_paths),
+            tuple(down_paths),
+            selection,
+            up_weight,
+            down_weight,
+        )
+        if cache_key not in self._sum_cache:
+            is_up = " || ".join(
+                f'rdfsampleinfo_.Contains("{path}")' for path in up_paths
+            )
+            df = self._make_df(list(up_paths) + list(down_paths)).DefinePerSample(
+                "isUp", f"(double)({is_up})"
+            )
+            df = self._tag_resolved(df, resolved_paths).Filter(selection)
+            up_ptr = df.Define("up_w", f"multW({up_weight}, isUp)").Sum("up_w")
+            down_ptr = df.Define("down_w", f"multW({down_weight}, 1.0 - isUp)").Sum(
+                "down_w"
+            )
+            self._sum_cache[cache_key] = (up_ptr, down_ptr)
+        return self._sum_cache[cache_key]
+
+    def _prepare_paths(self):
+        """Precompute every chain file list once at config load.
+
+        Each flavour and sample-based variation gets one flat path list
+        spanning all folders, plus the subset of paths sitting in resolved
+        folders, which drives the per-sample selection tag at booking.
+        """
+        base_path = self.config["base_path"]
+        folders = self.config["folders"]
+
+        def chain_paths(files, is_resolved):
+            paths = []
+            resolved_paths = []
+            for folder in folders:
+                for f in files:
+                    path = os.path.join(base_path, folder, ensure_root_extension(f))
+                    paths.append(path)
+                    if is_resolved(folder):
+                        resolved_paths.append(path)
+            return tuple(paths), tuple(resolved_paths)
+
+        def flavour_resolved(folder):
+            return "boosted" not in folder and "2l_" not in folder
+
+        def sample_resolved(folder):
+            # the sample-based variations only special-case boosted folders
+            return "boosted" not in folder
+
+        for flavour_config in self.config["flavours"].values():
+            flavour_config["_paths"], flavour_config["_resolved_paths"] = chain_paths(
+                flavour_config["files"], flavour_resolved
+            )
+            for systematic in flavour_config["systematics"]:
+                if systematic["type"] != "sample":
+                    continue
+                for variation_type in ["up", "down"]:
+                    variation_key = f"{variation_type}_files"
+                    if variation_key in systematic:
+                        (
+                            systematic[f"_{variation_type}_paths"],
+                            systematic[f"_{variation_type}_resolved_paths"],
+                        ) = chain_paths(systematic[variation_key], sample_resolved)
+
+    def _prepare_selections(self):
+        """Precompute the combined selection string per flavour once.
+
+        With all folders chained into one dataframe, the resolved-only
+        extra selection is folded into a single filter expression gated on
+        the per-sample isResolved tag, so one JIT-compiled filter serves
+        every folder. The extra selection is configured as an " && ..."
+        suffix, hence the "(1 ...)" wrapping.
+        """
+        resolved_selection = self.config.get("extra_selections", {}).get("resolved", "")
+        for flavour_config in self.config["flavours"].values():
+            selection = flavour_config["selection"]
+            if resolved_selection:
+                flavour_config["_selection"] = (
+                    f"({selection})"
+                    f" && ((isResolved == 0) || (1{resolved_selection}))"
+                )
+            else:
+                flavour_config["_selection"] = selection
+
+    def _prepare_tasks(self):
+        """Flatten the nested config into frozen YieldTask booking units."""
+        for flavour_name, flavour_config in self.config["flavours"].items():
+            weight_systematics = tuple(
+                WeightSystematic(
+                    systematic["name"],
+                    systematic["up_weight"],
+                    systematic["down_weight"],
+                )
+                for systematic in flavour_config["systematics"]
+                if systematic["type"] == "weight"
+            )
+            flavour_config["_tasks"] = (
+                YieldTask(
+                    flavour=flavour_name,
+                    paths=flavour_config["_paths"],
+                    resolved_paths=flavour_config["_resolved_paths"],
+                    selection=flavour_config["_selection"],
+                    weight_systematics=weight_systematics,
+                ),
+            )
+
+    def restrict_run(self, systematics=None, flavours=None):
+        """Limit the run to the given systematics and/or flavours.
+
+        Prunes the config and re-flattens the booking tasks in one place,
+        so the flattened plan can never go stale relative to the config.
+        """
+        if systematics is not None:
+            for flavour_config in self.config["flavours"].values():
+                flavour_config["systematics"] = [
+                    systematic
+                    for systematic in flavour_config["systematics"]
+                    if systematic["name"] in systematics
+                ]
+        if flavours is not None:
+            self.config["flavours"] = {
+                flavour: config
+                for flavour, config in self.config["flavours"].items()
+                if flavour in flavours
+            }
+        self._prepare_tasks()
 
     def validate_config(self, config):
         required_keys = ["base_path", "folders", "nominal_weight", "flavours"]
@@ -68,12 +351,30 @@ class SystematicYieldCalc:
         return True
 
     def read_config(self, config_file):
+        # reuse the pickled parse from a previous invocation if the YAML has
+        # not changed since, e.g. during --systematics/--flavours sweeps
+        cache_file = config_file + ".pkl"
+        try:
+            if os.path.getmtime(cache_file) > os.path.getmtime(config_file):
+                with open(cache_file, "rb") as f:
+                    return pickle.load(f)
+        except (OSError, EOFError, pickle.PickleError):
+            pass  # no valid cache yet, fall through to the YAML parse
+
         try:
             with open(config_file, "r") as f:
-                config = yaml.safe_load(f)
+                config = yaml.load(f, Loader=SafeLoader)
             if config is None:
                 logger.error(f"Configuration file '{config_file}' is empty.")
                 return None
+            try:
+                # write-then-rename so an interrupted run can never leave a
+                # truncated cache with an mtime newer than the YAML
+                with open(cache_file + ".tmp", "wb") as f:
+                    pickle.dump(config, f)
+                os.replace(cache_file + ".tmp", cache_file)
+            except OSError:
+                pass  # read-only config location, caching is best-effort
             return config
         except FileNotFoundError:
             logger.error(f"Config file '{config_file}' not found.")
@@ -82,222 +383,230 @@ class SystematicYieldCalc:
             logger.error(f"Error while loading config file '{config_file}': {e}")
             return None
 
-    def calculate_yields(self, df, weight_expressions, selection):
-        def fill_result(result, weight_name, weight_expr):
-            result.yields[weight_name] = (
-                df.Define(f"weight_{weight_name}", weight_expr)
-                .Sum(f"weight_{weight_name}")
-                .GetValue()
-            )
+    def calculate_yields(self, df, nominal_weight, systematics):
+        """Book the nominal Sum with one weight variation per systematic.
 
+        Expects an already-filtered dataframe so the selection is evaluated
+        once and shared by every booked action. All variations are computed
+        via df.Vary in the same event loop as the nominal; the returned
+        YieldResult holds the lazy nominal RResultPtr and the RResultMap of
+        varied sums, so nothing runs until the caller triggers the booked
+        graphs (via ROOT.RDF.RunGraphs).
+        """
         result = YieldResult()
-        df = df.Filter(selection)
-        for name, weight_expr in weight_expressions.items():
-            fill_result(result, name, weight_expr)
+        df = df.Define("nominal_w", f"(double)({nominal_weight})")
+        for systematic in systematics:
+            sys_name = systematic.name
+            df = df.Define(
+                f"{sys_name}_up_w", f"(double)({systematic.up_weight})"
+            ).Define(f"{sys_name}_down_w", f"(double)({systematic.down_weight})")
+            df = df.Vary(
+                "nominal_w",
+                f"varyW(nominal_w, {sys_name}_up_w, {sys_name}_down_w)",
+                ["up", "down"],
+                sys_name,
+            )
+        result.nominal_ptr = df.Sum("nominal_w")
+        result.variations = self._variations_for(result.nominal_ptr)
+        result.systematic_names = [systematic.name for systematic in systematics]
         return result
 
-    def process_weight_based_systematic(self, systematic, weight_expressions):
-        sys_name = systematic["name"]
-        weight_expressions[f"{sys_name}_up"] = (
-            f"({weight_expressions['nominal']})*({systematic['up_weight']})"
-        )
-        weight_expressions[f"{sys_name}_down"] = (
-            f"({weight_expressions['nominal']})*({systematic['down_weight']})"
-        )
+    def book_sample_based_systematic(self, systematic, nominal_weight, selection):
+        """Book the up/down variation Sums for one sample-based systematic.
 
-    def process_sample_based_systematic(
-        self,
-        systematic,
-        systematic_yields,
-        base_path,
-        folders,
-        nominal_weight,
-        selection,
-        flavour_config,
-    ):
+        Each variation is one chain spanning every folder; when both
+        variations are defined their files are concatenated and tagged per
+        sample, so a single filtered event loop fills both Sums. The
+        bookings are returned as {f"{name}_{variation}": [RResultPtr, ...]}
+        so the caller can batch them into a single RunGraphs launch.
+        """
+        sys_name = systematic["name"]
+        present = [v for v in ["up", "down"] if f"{v}_files" in systematic]
         for variation_type in ["up", "down"]:
-            variation_key = f"{variation_type}_files"
-            if variation_key in systematic:
-                sys_yield = 0
-
-                additional_weight = systematic.get(f"{variation_type}_weight", "1")
-                combined_weight = f"({nominal_weight})*({additional_weight})"
-
-                for file_rel_path in systematic[variation_key]:
-                    file_rel_path_with_ext = ensure_root_extension(file_rel_path)
-                    for folder in folders:
-                        adjusted_selection = selection
-                        if "boosted" not in folder:
-                            # check if we have an extra selection for resolved
-                            resolved_selection = self.config.get("extra_selections", {}).get("resolved", "")
-                            adjusted_selection += resolved_selection
-
-                        sample_path = os.path.join(
-                            base_path, folder, file_rel_path_with_ext
-                        )
-                        logger.info(
-                            f"Processing {variation_type} variation for {systematic['name']}: {sample_path}"
-                        )
-                        df = ROOT.RDataFrame("nominal_Loose", sample_path)
-                        result = self.calculate_yields(
-                            df, {"nominal": combined_weight}, adjusted_selection
-                        )
-                        sys_yield += result.yields["nominal"]
-                systematic_yields[f"{systematic['name']}_{variation_type}"] = sys_yield
-            else:
+            if variation_type not in present:
                 logger.info(
-                    f"No '{variation_type}' variation defined for {systematic['name']}."
+                    f"No '{variation_type}' variation defined for {sys_name}."
                 )
 
-    def process_flavour(self, base_path, folders, nominal_weight, flavour_config):
-        selection = flavour_config["selection"]
-        weight_expressions = {"nominal": nominal_weight}
-        for systematic in flavour_config["systematics"]:
-            if systematic["type"] == "weight":
-                self.process_weight_based_systematic(systematic, weight_expressions)
-
-        result = YieldResult()
-        for folder in folders:
-            adjusted_selection = selection
-            if "boosted" not in folder and "2l_" not in folder:
-                # check if we have an extra selection for resolved
-                resolved_selection = self.config.get("extra_selections", {}).get("resolved", "")
-                adjusted_selection += resolved_selection
+        booked = {}
+        if len(present) == 2:
+            up_weight = f"multW({nominal_weight}, {systematic.get('up_weight', '1')})"
+            down_weight = (
+                f"multW({nominal_weight}, {systematic.get('down_weight', '1')})"
+            )
+            up_paths = systematic["_up_paths"]
+            down_paths = systematic["_down_paths"]
+            logger.info(
+                f"Processing up/down variations for {sys_name}: {', '.join(up_paths + down_paths)}"
+            )
+            up_ptr, down_ptr = self._book_variation_sums(
+                up_paths,
+                down_paths,
+                systematic["_up_resolved_paths"] + systematic["_down_resolved_paths"],
+                selection,
+                up_weight,
+                down_weight,
+            )
+            booked[f"{sys_name}_up"] = [up_ptr]
+            booked[f"{sys_name}_down"] = [down_ptr]
+            return booked
 
-            for file_rel_path in flavour_config["files"]:
-                file_rel_path_with_ext = ensure_root_extension(file_rel_path)
-                sample_path = os.path.join(base_path, folder, file_rel_path_with_ext)
+        for variation_type in present:
+            additional_weight = systematic.get(f"{variation_type}_weight", "1")
+            combined_weight = f"multW({nominal_weight}, {additional_weight})"
 
-                logger.info(
-                    f"Processing nominal and weight-based systematics: {sample_path}"
+            sample_paths = systematic[f"_{variation_type}_paths"]
+            logger.info(
+                f"Processing {variation_type} variation for {sys_name}: {', '.join(sample_paths)}"
+            )
+            booked[f"{sys_name}_{variation_type}"] = [
+                self._book_sum(
+                    sample_paths,
+                    systematic[f"_{variation_type}_resolved_paths"],
+                    selection,
+                    combined_weight,
                 )
-                df = ROOT.RDataFrame("nominal_Loose", sample_path)
-                result.merge(
-                    self.calculate_yields(df, weight_expressions, adjusted_selection)
+            ]
+        return booked
+
+    def book_flavour(self, nominal_weight, flavour_config):
+        """Book every Sum (nominal, weight- and sample-based) for one flavour.
+
+        Returns the per-sample YieldResults and the sample-based systematic
+        bookings, all holding lazy RResultPtrs; no event loop runs until
+        the booked graphs are triggered.
+        """
+        booked_results = []
+        for task in flavour_config["_tasks"]:
+            # one chained dataframe per flavour so the Filter/Define strings
+            # are JIT-compiled once across every folder
+            logger.info(
+                f"Processing nominal and weight-based systematics: {', '.join(task.paths)}"
+            )
+            df = self._tag_resolved(self._make_df(list(task.paths)), task.resolved_paths)
+            booked_results.append(
+                self.calculate_yields(
+                    df.Filter(task.selection), nominal_weight, task.weight_systematics
                 )
+            )
 
-        systematic_yields = result.yields
-        nominal_yield = systematic_yields.pop("nominal", 0)
-
+        sample_bookings = {}
         for systematic in flavour_config["systematics"]:
             if systematic["type"] == "sample":
-                self.process_sample_based_systematic(
-                    systematic,
-                    systematic_yields,
-                    base_path,
-                    folders,
-                    nominal_weight,
-                    selection,
-                    flavour_config,
+                sample_bookings.update(
+                    self.book_sample_based_systematic(
+                        systematic, nominal_weight, flavour_config["_selection"]
+                    )
                 )
 
-        return nominal_yield, systematic_yields
+        return booked_results, sample_bookings
+
+    def collect_flavour(self, booked_results, sample_bookings, flavour_config):
+        """Materialise the booked nominal, weight- and sample-based yields.
+
+        ROOT already sums each chain internally in C++, so per booking
+        there is exactly one value to read; where several booked values
+        still contribute to one yield, math.fsum keeps the accumulation
+        out of repeated interpreter additions.
+        """
+        per_name = {}
+        for booked in booked_results:
+            booked.materialise()
+            for sys_name, yield_value in booked.yields.items():
+                per_name.setdefault(sys_name, []).append(yield_value)
+        systematic_yields = {
+            sys_name: math.fsum(values) for sys_name, values in per_name.items()
+        }
+        nominal_yield = systematic_yields.pop("nominal", 0)
 
-    def process_flavour_wrapper(self, args):
-        flavour_name, flavour_config = args
-        logger.info(f"Processing flavour: {flavour_name}")
-        return self.process_flavour(
-            self.config["base_path"],
-            self.config["folders"],
-            self.config["nominal_weight"],
-            flavour_config,
-        )
+        for sys_key, ptrs in sample_bookings.items():
+            systematic_yields[sys_key] = math.fsum(ptr.GetValue() for ptr in ptrs)
 
-    def run(self, use_multiprocessing=False):
+        return nominal_yield, systematic_yields
+
+    def run(self):
         results = {}
-        if use_multiprocessing is True:
-            with multiprocessing.Pool() as pool:
-                flavour_results = pool.map(
-                    self.process_flavour_wrapper,
-                    self.config["flavours"].items(),
-                )
-                for flavour_name, (nominal_yield, systematic_yields) in zip(
-                    self.config["flavours"].keys(), flavour_results
-                ):
-                    renormalisations = {}
-                    for sys_name, sys_yield in systematic_yields.items():
-                        renorm = 1 / (sys_yield / nominal_yield) if nominal_yield else 0
-                        renormalisations[sys_name] = renorm
-
-                    results[flavour_name] = {
-                        "nominal": nominal_yield,
-                        "systematic_yields": systematic_yields,
-                        "renormalisations": renormalisations,
-                    }
-        else:
-            for flavour_name, flavour_config in self.config["flavours"].items():
-                logger.info(f"Processing flavour: {flavour_name}")
-                nominal_yield, systematic_yields = self.process_flavour(
-                    self.config["base_path"],
-                    self.config["folders"],
-                    self.config["nominal_weight"],
-                    flavour_config,
-                )
-                renormalisations = {}
-                for sys_name, sys_yield in systematic_yields.items():
-                    renorm = 1 / (sys_yield / nominal_yield) if nominal_yield else 0
-                    renormalisations[sys_name] = renorm
-
-                results[flavour_name] = {
-                    "nominal": nominal_yield,
-                    "systematic_yields": systematic_yields,
-                    "renormalisations": renormalisations,
-                }
+
+        # phase 1: book every flavour's computation graph lazily
+        booked_flavours = {}
+        for flavour_name, flavour_config in self.config["flavours"].items():
+            logger.info(f"Processing flavour: {flavour_name}")
+            booked_flavours[flavour_name] = self.book_flavour(
+                self.config["nominal_weight"], flavour_config
+            )
+
+        # phase 2: run all graphs concurrently on the implicit-MT pool
+        all_ptrs = []
+        for booked_results, sample_bookings in booked_flavours.values():
+            all_ptrs.extend(booked.nominal_ptr for booked in booked_results)
+            for ptrs in sample_bookings.values():
+                all_ptrs.extend(ptrs)
+        self._run_graphs(all_ptrs)
+
+        # phase 3: materialise the yields and compute the renormalisations
+        for flavour_name, (
+            booked_results,
+            sample_bookings,
+        ) in booked_flavours.items():
+            nominal_yield, systematic_yields = self.collect_flavour(
+                booked_results,
+                sample_bookings,
+                self.config["flavours"][flavour_name],
+            )
+            renormalisations = {}
+            for sys_name, sys_yield in systematic_yields.items():
+                renorm = 1 / (sys_yield / nominal_yield) if nominal_yield else 0
+                renormalisations[sys_name] = renorm
+
+            results[flavour_name] = {
+                "nominal": nominal_yield,
+                "systematic_yields": systematic_yields,
+                "renormalisations": renormalisations,
+            }
         return results
 
 
 def save_to_csv(results, output_file):
+    fieldnames = [
+        "Flavour",
+        "Systematic",
+        "Nominal yield",
+        "Systematic yield (up)",
+        "Systematic yield (down)",
+        "Renorm. value (up)",
+        "Renorm. value (down)",
+    ]
     with open(output_file, mode="w", newline="") as file:
-        writer = csv.writer(file)
-        header = [
-            "Flavour",
-            "Systematic",
-            "Nominal yield",
-            "Systematic yield (up)",
-            "Systematic yield (down)",
-            "Renorm. value (up)",
-            "Renorm. value (down)",
-        ]
-        writer.writerow(header)
+        writer = csv.DictWriter(file, fieldnames=fieldnames)
+        writer.writeheader()
 
         for flavour, result in results.items():
-            nominal_yield = result["nominal"]
-            systematics_processed = set()
-
-            for sys_name, sys_yield in result["systematic_yields"].items():
-                base_sys_name = sys_name.rsplit("_", 1)[0]
-
-                if base_sys_name in systematics_processed:
-                    continue
-
-                systematics_processed.add(base_sys_name)
-
-                up_yield = result["systematic_yields"].get(f"{base_sys_name}_up", "N/A")
-                down_yield = result["systematic_yields"].get(
-                    f"{base_sys_name}_down", "N/A"
-                )
-
-                renorm_up = (
-                    "N/A"
-                    if up_yield == "N/A"
-                    else 1 / (float(up_yield) / nominal_yield)
-                )
-                renorm_down = (
-                    "N/A"
-                    if down_yield == "N/A"
-                    else 1 / (float(down_yield) / nominal_yield)
-                )
+            systematic_yields = result["systematic_yields"]
+            renormalisations = result["renormalisations"]
 
+            # deduplicate the up/down suffixes while keeping config order
+            base_sys_names = dict.fromkeys(
+                sys_name.rsplit("_", 1)[0] for sys_name in systematic_yields
+            )
+            for base_sys_name in base_sys_names:
                 writer.writerow(
-                    [
-                        flavour,
-                        base_sys_name,
-                        nominal_yield,
-                        up_yield,
-                        down_yield,
-                        renorm_up if renorm_up != "N/A" else "N/A",
-                        renorm_down if renorm_down != "N/A" else "N/A",
-                    ]
+                    {
+                        "Flavour": flavour,
+                        "Systematic": base_sys_name,
+                        "Nominal yield": result["nominal"],
+                        "Systematic yield (up)": systematic_yields.get(
+                            f"{base_sys_name}_up", "N/A"
+                        ),
+                        "Systematic yield (down)": systematic_yields.get(
+                            f"{base_sys_name}_down", "N/A"
+                        ),
+                        "Renorm. value (up)": renormalisations.get(
+                            f"{base_sys_name}_up", "N/A"
+                        ),
+                        "Renorm. value (down)": renormalisations.get(
+                            f"{base_sys_name}_down", "N/A"
+                        ),
+                    }
                 )
 
 
@@ -331,12 +640,11 @@ if __name__ == "__main__":
     )
 
     parser.add_argument(
-        "--multiprocessing",
-        action="store_true",
-        help="Use multi-processing to calculate yields (default: False)"
-        "This will run all flavours in parallel and speeds up the"
-        "calculation, but beward the use of your computational resources"
-        "as it will use all available cores.",
+        "--dask-scheduler",
+        default=None,
+        help="Address of a Dask scheduler (e.g. tcp://host:8786). If given,"
+        "the event loops are distributed over the Dask cluster instead of"
+        "running locally.",
     )
 
     args = parser.parse_args()
@@ -345,28 +653,15 @@ if __name__ == "__main__":
     output_csv_file = args.output_file
     systematics_to_run = args.systematics
     flavours_to_run = args.flavours
-    use_multiprocessing = args.multiprocessing
-
-    systematic_yield_calc = SystematicYieldCalc(config_file)
 
-    # filter systematics
-    if systematics_to_run is not None:
-        for flavour_config in systematic_yield_calc.config["flavours"].values():
-            flavour_config["systematics"] = [
-                systematic
-                for systematic in flavour_config["systematics"]
-                if systematic["name"] in systematics_to_run
-            ]
-    # filter flavours
-    if flavours_to_run is not None:
-        systematic_yield_calc.config["flavours"] = {
-            flavour: config
-            for flavour, config in systematic_yield_calc.config["flavours"].items()
-            if flavour in flavours_to_run
-        }
+    systematic_yield_calc = SystematicYieldCalc(
+        config_file, dask_scheduler=args.dask_scheduler
+    )
 
-    if use_multiprocessing is True:
-        logger.info("Using multi-processing to calculate yields.")
+    if systematics_to_run is not None or flavours_to_run is not None:
+        systematic_yield_calc.restrict_run(
+            systematics=systematics_to_run, flavours=flavours_to_run
+        )
 
     logging.info("Running over the following flavours:")
     for flavour in systematic_yield_calc.config["flavours"]: